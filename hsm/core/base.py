@@ -4,23 +4,18 @@ from typing import Any, Dict, List, Optional
 
 @dataclass(eq=False)
 class StateBase:
-    """Base class for state functionality"""
+    """
+    Base class for state functionality. States compare and hash by identity,
+    using the default object implementations.
+    """
 
     name: str
     parent: Optional["StateBase"] = None
     entry_actions: List[callable] = field(default_factory=list)
     exit_actions: List[callable] = field(default_factory=list)
 
-    def __hash__(self) -> int:
-        """Make states hashable based on their name and memory address."""
-        # Use object id to break cycles while maintaining uniqueness
-        return hash((self.name, id(self)))
-
-    def __eq__(self, other: object) -> bool:
-        """States are equal if they are the same object."""
-        if not isinstance(other, StateBase):
-            return NotImplemented
-        return id(self) == id(other)
+    # Cheaper than isinstance(state, CompositeState) on the dispatch path
+    _is_composite = False
 
     def on_enter(self) -> None:
         """Execute entry actions"""
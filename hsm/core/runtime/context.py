@@ -42,14 +42,11 @@ class RuntimeContext:
         Returns True if a transition was taken.
         """
         with self._transition_lock:
-            # Get valid transitions from the graph
-            valid_transitions = self._graph.get_valid_transitions(self._current_state, event)
-            if not valid_transitions:
+            # Take highest priority valid transition from the graph
+            transition = self._graph.get_first_valid_transition(self._current_state, event)
+            if transition is None:
                 return False
 
-            # Take highest priority transition
-            transition = max(valid_transitions, key=lambda t: t.get_priority())
-
             # Record history before exit
             self._record_history(self._current_state)
 
@@ -65,12 +62,10 @@ class RuntimeContext:
         """Record state history for composite states."""
         with self._history_lock:
             # Find all ancestor composite states
-            ancestors = self._graph.get_ancestors(state)
-            for ancestor in ancestors:
-                if isinstance(ancestor, CompositeState):
-                    self._history[ancestor] = _StateHistoryRecord(
-                        timestamp=time.time(), state=state, composite_state=ancestor
-                    )
+            for ancestor in self._graph.get_composite_ancestors(state):
+                self._history[ancestor] = _StateHistoryRecord(
+                    timestamp=time.time(), state=state, composite_state=ancestor
+                )
 
     def get_history_state(self, composite_state: CompositeState) -> Optional[State]:
         """Get the last active state for a composite state."""
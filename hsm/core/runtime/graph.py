@@ -1,13 +1,13 @@
 """Graph-based state machine structure management."""
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 from ..base import StateBase
 from ..errors import ValidationError
 from ..events import Event
 from ..states import CompositeState, State
-from ..transitions import Transition
+from ..transitions import Transition, _TransitionPrioritySorter
 
 
 @dataclass
@@ -25,7 +25,7 @@ class _GraphNode:
     def __eq__(self, other):
         if not isinstance(other, _GraphNode):
             return NotImplemented
-        return self.state == other.state
+        return self.state is other.state
 
 
 class StateGraph:
@@ -36,13 +36,41 @@ class StateGraph:
 
     def __init__(self) -> None:
         self._nodes: Dict[State, _GraphNode] = {}
-        self._transitions: Dict[State, Set[Transition]] = {}
+        # Outgoing transitions per source state, ordered by descending priority
+        self._transitions: Dict[State, List[Transition]] = {}
+        self._sorter = _TransitionPrioritySorter()
+        # Whether every outgoing transition of a state has pure guards; only states with transitions appear
+        self._pure_guards: Dict[State, bool] = {}
+        # Composite ancestors per state, rebuilt lazily after the hierarchy changes
+        self._composite_ancestors: Dict[State, Tuple[CompositeState, ...]] = {}
+        # Canonical state per (parent, name), so each name denotes one state object in its scope
+        self._canonical: Dict[Tuple[Optional[State], str], State] = {}
+        self._scopes: Dict[State, Optional[State]] = {}
+
+    def intern_state(self, state: State, scope: Optional[State]) -> None:
+        """
+        Register a state as the only state with its name within its parent scope.
+        The scope is the state's hierarchical parent, which may differ from its
+        parent in this graph.
+
+        :raises ValueError: If a different state with this name is already in the scope.
+        """
+        registered = state in self._scopes
+        old_scope = self._scopes.get(state)
+        if registered and old_scope is scope:
+            return
+        if self._canonical.setdefault((scope, state.name), state) is not state:
+            raise ValueError(f"A different state named {state.name} is already in this scope")
+        if registered:
+            # Moved to a new parent scope, release the old one
+            self._canonical.pop((old_scope, state.name), None)
+        self._scopes[state] = scope
 
     def add_state(self, state: State, parent: Optional[State] = None) -> None:
         """Add a state to the graph with optional parent."""
         if state not in self._nodes:
             self._nodes[state] = _GraphNode(state=state)
-            self._transitions[state] = set()
+            self._transitions[state] = []
 
         if parent:
             if parent not in self._nodes:
@@ -55,6 +83,8 @@ class StateGraph:
             parent_node.children.add(state_node)
             state_node.parent = parent_node
             state.parent = parent
+            # Attaching a parent changes the ancestry of the whole subtree
+            self._composite_ancestors.clear()
 
     def add_transition(self, transition: Transition) -> None:
         """Add a transition to the graph."""
@@ -63,18 +93,30 @@ class StateGraph:
         if transition.target not in self._nodes:
             raise ValueError(f"Target state {transition.target.name} not in graph")
 
-        self._transitions[transition.source].add(transition)
+        bucket = self._transitions[transition.source]
+        if transition not in bucket:
+            self._sorter.insert(bucket, transition)
+            source = transition.source
+            self._pure_guards[source] = self._pure_guards.get(source, True) and transition.pure_guards
         self._nodes[transition.source].transitions.add(transition)
 
     def get_valid_transitions(self, state: State, event: Event) -> List[Transition]:
-        """Get all valid transitions from a state for an event."""
-        if state not in self._transitions:
-            return []
-        return sorted(
-            [t for t in self._transitions[state] if t.evaluate_guards(event)],
-            key=lambda t: t.get_priority(),
-            reverse=True,
-        )
+        """Get all valid transitions from a state for an event, highest priority first."""
+        return [t for t in self._transitions.get(state, ()) if t.evaluate_guards(event)]
+
+    def get_first_valid_transition(self, state: State, event: Event) -> Optional[Transition]:
+        """Get the highest priority valid transition from a state for an event, if any."""
+        for t in self._transitions.get(state, ()):
+            if t.evaluate_guards(event):
+                return t
+        return None
+
+    def has_pure_guards(self, state: State) -> bool:
+        """
+        Check whether transition selection from a state depends only on the event name,
+        i.e. the state has outgoing transitions and every one declares pure guards.
+        """
+        return self._pure_guards.get(state, False)
 
     def get_ancestors(self, state: State) -> List[State]:
         """Get all ancestor states in order from immediate parent to root."""
@@ -88,6 +130,14 @@ class StateGraph:
             ancestors.append(current.state)
         return ancestors
 
+    def get_composite_ancestors(self, state: State) -> Tuple[CompositeState, ...]:
+        """Get composite ancestor states in order from immediate parent to root."""
+        ancestors = self._composite_ancestors.get(state)
+        if ancestors is None:
+            ancestors = tuple(a for a in self.get_ancestors(state) if a._is_composite)
+            self._composite_ancestors[state] = ancestors
+        return ancestors
+
     def get_children(self, state: State) -> Set[State]:
         """Get immediate child states of a state."""
         if state not in self._nodes:
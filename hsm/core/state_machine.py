@@ -3,10 +3,11 @@
 # Licensed under the MIT License - see LICENSE file for details
 
 import asyncio
-import threading
+import sys
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 
 from hsm.core.events import Event
 from hsm.core.hooks import HookManager, HookProtocol
@@ -16,8 +17,20 @@ from hsm.core.states import CompositeState, State
 from hsm.core.transitions import Transition, _TransitionPrioritySorter
 from hsm.core.validations import ValidationError, Validator
 
+# Bound once to skip the module attribute lookup on every transition
+_time = time.time
 
-@dataclass(frozen=True)
+# Marks a dispatch cache miss, since None is a valid cached result
+_MISSING = object()
+
+# Maximum number of (state, event name) selections kept in the dispatch cache
+_DISPATCH_CACHE_SIZE = 1024
+
+# dataclass(slots=True) requires Python 3.10+
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class _StateHistoryRecord:
     """Immutable record of historical state information"""
 
@@ -36,28 +49,31 @@ class _StateMachineContext:
         self._initial_state = initial_state  # Store initial state
         self._current_state = initial_state
         self._transitions: List[Transition] = []
-        self._states = {initial_state}  # Track all states
+        # Outgoing transitions per source state, ordered by descending priority
+        self._by_source: Dict[State, List[Transition]] = {}
+        self._sorter = _TransitionPrioritySorter()
+        self._states: Dict[State, None] = {initial_state: None}  # Track all states, insertion ordered
         self._history: Dict[CompositeState, _StateHistoryRecord] = {}
-        self._history_lock = threading.Lock()
 
     def get_current_state(self) -> State:
         return self._current_state
 
     def set_current_state(self, state: State) -> None:
         self._current_state = state
-        self._states.add(state)
+        self._states[state] = None
 
     def get_transitions(self) -> List[Transition]:
         return self._transitions
 
-    def get_states(self) -> set[State]:
-        return self._states
+    def get_states(self) -> Set[State]:
+        return set(self._states)
 
     def add_transition(self, transition: Transition) -> None:
         self._transitions.append(transition)
+        self._sorter.insert(self._by_source.setdefault(transition.source, []), transition)
         # Track states from transitions
-        self._states.add(transition.source)
-        self._states.add(transition.target)
+        self._states[transition.source] = None
+        self._states[transition.target] = None
 
     def start(self) -> None:
         """Start the context, initializing the current state."""
@@ -71,23 +87,24 @@ class _StateMachineContext:
 
     def process_event(self, event: Event) -> None:
         """Process an event in the current context."""
-        # Implementation similar to StateMachine.process_event
-        valid_transitions = [
-            t for t in self._transitions if t.source == self._current_state and t.evaluate_guards(event)
-        ]
-        if valid_transitions:
-            transition = sorted(valid_transitions, key=lambda t: t.get_priority(), reverse=True)[0]
+        # Buckets are priority ordered, so the first passing transition wins
+        transition = None
+        for t in self._by_source.get(self._current_state, ()):
+            if t.evaluate_guards(event):
+                transition = t
+                break
+        if transition is not None:
             self._current_state.on_exit()
             transition.execute_actions(event)
             self._current_state = transition.target
             self._current_state.on_enter()
 
     def record_state_exit(self, composite_state: CompositeState, active_state: State) -> None:
-        """Thread-safe recording of state history"""
-        with self._history_lock:
-            self._history[composite_state] = _StateHistoryRecord(
-                timestamp=time.time(), state=active_state, composite_state=composite_state
-            )
+        """
+        Thread-safe recording of state history. A single dict item assignment of
+        an immutable record is atomic under the GIL, so no lock is needed.
+        """
+        self._history[composite_state] = _StateHistoryRecord(_time(), active_state, composite_state)
 
     def get_history_state(self, composite_state: CompositeState) -> Optional[State]:
         """Get the last active state for a composite state."""
@@ -95,10 +112,13 @@ class _StateMachineContext:
         return record.state if record else None
 
     def reset_history(self) -> None:
-        """Fully reset all history state"""
-        with self._history_lock:
-            self._history.clear()
-            self._current_state = self._initial_state  # Reset to initial state
+        """
+        Fully reset all history state. The history dict is swapped rather than
+        cleared, which is atomic without a lock; a record written concurrently
+        with the reset may be lost, which is acceptable for a reset.
+        """
+        self._history = {}
+        self._current_state = self._initial_state  # Reset to initial state
 
 
 class _ErrorRecoveryStrategy:
@@ -122,25 +142,40 @@ class StateMachine:
         """Initialize the state machine with an initial state."""
         self._graph = StateGraph()
         self._initial_state = initial_state
-        self._current_state = initial_state  # Set current state immediately
+        self._set_current_state(initial_state)  # Set current state immediately
         self._validator = validator or Validator()
         self._hooks = hooks or []
+        self._partition_hooks()
         self._started = False
         self._context = _StateMachineContext(initial_state)
+        # Bumped on every structural change so start() can skip unchanged revalidation
+        self._graph_revision = 0
+        self._last_validated_rev = -1
+        # LRU of selected transition per (id(state), event name), for states whose guards are all pure
+        self._dispatch_cache: "OrderedDict[Tuple[int, str], Optional[Transition]]" = OrderedDict()
 
         # Add initial state to graph
+        self._graph.intern_state(initial_state, initial_state.parent)
         self._graph.add_state(initial_state)
 
     def add_state(self, state: State, parent: Optional[State] = None) -> None:
-        """Add a state to the machine."""
+        """
+        Add a state to the machine. Two different State objects with the same name
+        are not allowed within one parent scope.
+
+        :raises ValueError: If another state with this name already exists in the scope.
+        """
+        self._graph.intern_state(state, parent if parent is not None else state.parent)
         self._graph.add_state(state, parent)
+        self._graph_revision += 1
+        self._dispatch_cache.clear()
         # Update internal state tracking
         if parent is not None:
             state.parent = parent
             if hasattr(parent, "_children"):
                 parent._children.add(state)
         # Update context's state set directly
-        self._context._states.add(state)
+        self._context._states[state] = None
 
     @property
     def current_state(self) -> Optional[State]:
@@ -151,26 +186,33 @@ class StateMachine:
         """Get the current state (deprecated, use current_state property)."""
         return self._current_state
 
+    def add_hook(self, hook: HookProtocol) -> None:
+        """
+        Add a hook to the machine. Hooks must be added through this method rather
+        than by mutating the hook list, so their callbacks are picked up.
+        """
+        self._hooks.append(hook)
+        self._partition_hooks()
+
     def add_transition(self, transition: Transition) -> None:
         """Add a transition to the machine."""
         self._graph.add_transition(transition)
         self._context.add_transition(transition)
+        self._graph_revision += 1
+        self._dispatch_cache.clear()
 
     def get_history_state(self, composite_state: CompositeState) -> Optional[State]:
         """Get the last active state for a composite state."""
         return self._context.get_history_state(composite_state)
 
+    def _set_current_state(self, state: Optional[State]) -> None:
+        """Set the current state. Subclasses extend this to refresh state-derived caches."""
+        self._current_state = state
+
     def _get_parent_composite_state(self, state: State) -> Optional[CompositeState]:
         """Get the parent composite state if it exists."""
-        if state and state.parent and isinstance(state.parent, CompositeState):
-            return state.parent
-        return None
-
-    def _get_state_from_history(self, composite_state: CompositeState) -> Optional[State]:
-        """Get state from history if it exists."""
-        if self._context._history:  # Only check if history dict exists and isn't empty
-            return self._context.get_history_state(composite_state)
-        return None
+        parent = state.parent if state else None
+        return parent if parent is not None and parent._is_composite else None
 
     def _resolve_state_for_start(self) -> State:
         """
@@ -181,22 +223,10 @@ class StateMachine:
         3. If no history, use parent's initial state
         4. Fall back to machine's initial state
         """
-        # Start with current state or initial state
-        state = self._current_state or self._initial_state
-
-        # Check if we're in a composite state
-        parent = self._get_parent_composite_state(state)
-        if parent:
-            # Check history first
-            history_state = self._get_state_from_history(parent)
-            if history_state:
-                return history_state
-            # No history, use parent's initial state
-            if parent._initial_state:
-                return parent._initial_state
-
-        # Fall back to machine's initial state
-        return self._initial_state
+        parent = self._get_parent_composite_state(self._current_state or self._initial_state)
+        if parent is None:
+            return self._initial_state
+        return self._context.get_history_state(parent) or parent._initial_state or self._initial_state
 
     def start(self) -> None:
         """Start the state machine."""
@@ -204,14 +234,17 @@ class StateMachine:
             return
 
         # Resolve the correct starting state
-        self._current_state = self._resolve_state_for_start()
+        self._set_current_state(self._resolve_state_for_start())
+
+        # Validate machine structure, unless unchanged since it last passed
+        if self._graph_revision != self._last_validated_rev:
+            errors = self._graph.validate()
+            if errors:
+                raise ValidationError("\n".join(errors))
 
-        # Validate machine structure
-        errors = self._graph.validate()
-        if errors:
-            raise ValidationError("\n".join(errors))
+            self._validator.validate_state_machine(self)
+            self._last_validated_rev = self._graph_revision
 
-        self._validator.validate_state_machine(self)
         self._notify_enter(self._current_state)
         self._started = True
 
@@ -227,7 +260,7 @@ class StateMachine:
                 self._context.record_state_exit(parent, self._current_state)
 
             self._notify_exit(self._current_state)
-            self._current_state = None
+            self._set_current_state(None)
             self._context._current_state = None
 
         self._started = False
@@ -237,17 +270,26 @@ class StateMachine:
         if not self._started or not self._current_state:
             return False
 
-        # If current state is composite, use its active child state for transitions
+        # If current state is composite, use its initial child state for transitions.
+        # Read on every event, since the composite's initial state can be reassigned.
         active_state = self._current_state
-        if isinstance(active_state, CompositeState):
+        if active_state._is_composite:
             active_state = active_state._initial_state
 
-        valid_transitions = self._graph.get_valid_transitions(active_state, event)
-        if not valid_transitions:
+        # Take highest priority transition, memoized when the guards are pure
+        key = (id(active_state), event.name)
+        transition = self._dispatch_cache.get(key, _MISSING)
+        if transition is _MISSING:
+            transition = self._graph.get_first_valid_transition(active_state, event)
+            if self._graph.has_pure_guards(active_state):
+                self._dispatch_cache[key] = transition
+                if len(self._dispatch_cache) > _DISPATCH_CACHE_SIZE:
+                    self._dispatch_cache.popitem(last=False)
+        else:
+            self._dispatch_cache.move_to_end(key)
+        if transition is None:
             return False
 
-        # Take highest priority transition
-        transition = max(valid_transitions, key=lambda t: t.get_priority())
         self._execute_transition(transition, event)
         return True
 
@@ -258,10 +300,8 @@ class StateMachine:
 
         try:
             # Record history for all ancestor composite states
-            ancestors = self._graph.get_ancestors(self._current_state)
-            for ancestor in ancestors:
-                if isinstance(ancestor, CompositeState):
-                    self._context.record_state_exit(ancestor, self._current_state)
+            for ancestor in self._graph.get_composite_ancestors(self._current_state):
+                self._context.record_state_exit(ancestor, self._current_state)
 
             # Exit current state
             self._notify_exit(self._current_state)
@@ -270,7 +310,7 @@ class StateMachine:
             transition.execute_actions(event)
 
             # Enter new state
-            self._current_state = transition.target
+            self._set_current_state(transition.target)
             self._notify_enter(self._current_state)
 
         except Exception as e:
@@ -284,61 +324,68 @@ class StateMachine:
                 # Re-raise if no recovery strategy
                 raise
 
+    def _partition_hooks(self) -> None:
+        """Resolve hook callbacks once so notification needs no introspection."""
+        self._enter_hooks = tuple(
+            h.on_enter for h in self._hooks if hasattr(h, "on_enter") and not asyncio.iscoroutinefunction(h.on_enter)
+        )
+        self._exit_hooks = tuple(h.on_exit for h in self._hooks if hasattr(h, "on_exit"))
+        self._error_hooks = tuple(h.on_error for h in self._hooks if hasattr(h, "on_error"))
+
     def _notify_enter(self, state: State) -> None:
-        """Notify hooks of state entry."""
+        """Notify hooks of state entry. Async hooks are skipped in synchronous context."""
         state.on_enter()
-        for hook in self._hooks:
-            if hasattr(hook, "on_enter"):
-                hook_method = hook.on_enter
-                # Skip async hooks in synchronous context
-                if not asyncio.iscoroutinefunction(hook_method):
-                    hook_method(state)
+        for callback in self._enter_hooks:
+            callback(state)
 
     def _notify_exit(self, state: State) -> None:
         """Notify hooks of state exit."""
         state.on_exit()
-        for hook in self._hooks:
-            if hasattr(hook, "on_exit"):
-                hook.on_exit(state)
+        for callback in self._exit_hooks:
+            callback(state)
 
     def _notify_error(self, error: Exception) -> None:
         """Notify hooks of an error."""
-        for hook in self._hooks:
-            if hasattr(hook, "on_error"):
-                hook.on_error(error)
+        for callback in self._error_hooks:
+            callback(error)
 
     def detect_cycles(self) -> List[str]:
         """Detect cycles in the state hierarchy."""
-        visited = set()
-        path = set()
+        visited: Dict[State, None] = {}
+        in_path: Dict[State, bool] = {}
         cycles = []
 
-        def visit(state):
-            if state in path:
-                cycle_path = [s.name for s in path]
-                cycles.append(f"Cycle detected: {' -> '.join(cycle_path)}")
-                return
-
-            if state in visited:
-                return
-
-            visited.add(state)
-            path.add(state)
-
-            if isinstance(state, CompositeState):
-                for child in state._children:
-                    visit(child)
-
-            path.remove(state)
+        # Iterative DFS: each stack entry pairs a state with an iterator over a snapshot
+        # of its children, so hierarchy changes mid-walk cannot break iteration
+        root = self._initial_state
+        visited[root] = None
+        in_path[root] = True
+        stack = [(root, iter(tuple(root._children) if root._is_composite else ()))]
+        while stack:
+            state, children = stack[-1]
+            for child in children:
+                if child in in_path:
+                    cycle_path = [s.name for s in in_path]
+                    cycles.append(f"Cycle detected: {' -> '.join(cycle_path)}")
+                    continue
+                if child in visited:
+                    continue
+                visited[child] = None
+                in_path[child] = True
+                stack.append((child, iter(tuple(child._children) if child._is_composite else ())))
+                break
+            else:
+                # Children exhausted, leave this state
+                stack.pop()
+                del in_path[state]
 
-        visit(self._initial_state)
         return cycles
 
     def reset(self) -> None:
         """Reset the state machine to its initial configuration"""
         self.stop()
         self._context.reset_history()
-        self._current_state = self._initial_state
+        self._set_current_state(self._initial_state)
 
 
 class CompositeStateMachine(StateMachine):
@@ -348,8 +395,15 @@ class CompositeStateMachine(StateMachine):
     """
 
     def __init__(self, initial_state: State, validator: Optional[Validator] = None, hooks: Optional[List] = None):
-        super().__init__(initial_state, validator, hooks)
+        # Set before the base initializer, which sets the current state
         self._submachines = {}
+        super().__init__(initial_state, validator, hooks)
+
+    def _set_current_state(self, state: Optional[State]) -> None:
+        """Set the current state and refresh the active submachine."""
+        super()._set_current_state(state)
+        # Submachine of the current state, used first by process_event
+        self._active_submachine = self._submachines.get(state) if state is not None and state._is_composite else None
 
     def add_submachine(self, state: CompositeState, submachine: StateMachine) -> None:
         """Add a submachine for a composite state."""
@@ -361,21 +415,24 @@ class CompositeStateMachine(StateMachine):
             self._graph.add_state(sub_state, parent=state)
 
         self._submachines[state] = submachine
+        self._graph_revision += 1
+        self._dispatch_cache.clear()
+        if state is self._current_state:
+            self._active_submachine = submachine
 
     def start(self) -> None:
         """Start the composite state machine and maintain composite state hierarchy."""
         super().start()
         # Don't automatically enter submachine states
         # Let the submachine handle its own state entry
-        self._current_state = self._initial_state
+        self._set_current_state(self._initial_state)
 
     def process_event(self, event: Event) -> bool:
         """Process events in both the composite machine and relevant submachines."""
         # First try to process in current submachine if we're in a composite state
-        if isinstance(self._current_state, CompositeState):
-            submachine = self._submachines.get(self._current_state)
-            if submachine and submachine.process_event(event):
-                return True
+        submachine = self._active_submachine
+        if submachine is not None and submachine.process_event(event):
+            return True
 
         # If submachine didn't handle it, try processing at this level
         return super().process_event(event)
@@ -5,16 +5,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Set
 
 from hsm.core.base import StateBase
-from hsm.core.errors import TransitionError, ValidationError
-from hsm.core.events import Event
-from hsm.core.transitions import Transition
-
-if TYPE_CHECKING:
-    from hsm.core.hooks import Hook
-    from hsm.core.validations import Validator
+from hsm.core.errors import ValidationError
 
 
 class State(StateBase):
@@ -45,6 +39,8 @@ class CompositeState(StateBase):
     A state that can contain other states, forming a hierarchy.
     """
 
+    _is_composite = True
+
     def __init__(
         self,
         name: str,
@@ -90,7 +86,7 @@ class CompositeState(StateBase):
         # Check for circular dependency
         current = self
         while current is not None:
-            if current == state:
+            if current is state:
                 raise ValidationError("Circular dependency detected in state hierarchy")
             current = current.parent
 
@@ -108,33 +104,3 @@ class CompositeState(StateBase):
         """Get all child states."""
         return list(self._children)
 
-
-class StateMachine:
-    def __init__(self, initial_state: State, validator: Optional[Validator] = None, hooks: Optional[List[Hook]] = None):
-        self._initial_state = initial_state
-        self._current_state = initial_state  # Set initial state immediately
-        self._validator = validator or Validator()
-        self._hooks = hooks or []
-        self._started = False
-
-    def get_current_state(self) -> Optional[State]:
-        return self._current_state
-
-    def process_event(self, event: Event) -> None:
-        try:
-            transition = self._get_transition(event)
-            if transition:
-                self._execute_transition(transition, event)
-        except TransitionError as e:
-            if self._error_recovery:
-                self._error_recovery.recover(e, self)
-            else:
-                raise
-
-    def _execute_transition(self, transition: Transition, event: Event) -> None:
-        try:
-            transition.execute_actions(event)
-            self._current_state = transition.target
-        except Exception as e:
-            # Wrap any action execution errors
-            raise TransitionError(f"Action execution failed: {str(e)}") from e
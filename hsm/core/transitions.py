@@ -4,6 +4,8 @@
 
 from __future__ import annotations
 
+import bisect
+import operator
 from typing import TYPE_CHECKING, Callable, List, Optional
 
 from hsm.core.errors import TransitionError
@@ -27,6 +29,7 @@ class Transition:
         guards: Optional[List[Callable[[Event], bool]]] = None,
         actions: Optional[List[Callable[[Event], None]]] = None,
         priority: int = 0,
+        pure_guards: bool = False,
     ) -> None:
         """
         Initialize a transition with a source and target state, optional guards,
@@ -37,12 +40,17 @@ class Transition:
         :param guards: Guard conditions that must be true for the transition.
         :param actions: Actions to execute when the transition occurs.
         :param priority: Numeric priority; higher priority transitions are chosen first.
+        :param pure_guards: Declare that the guards depend only on the event name, so the
+                            state machine may cache transition selection per event name.
         """
         self._source = source
         self._target = target
         self._guards = guards if guards else []
         self._actions = actions if actions else []
         self._priority = priority
+        # Priority used to order dispatch buckets, refreshed when the transition is inserted
+        self._sort_priority = priority
+        self._pure_guards = pure_guards
 
     def evaluate_guards(self, event: Event) -> bool:
         """
@@ -51,7 +59,9 @@ class Transition:
         :param event: The triggering event.
         :return: True if all guards pass, otherwise False.
         """
-        return _GuardEvaluator().evaluate(self._guards, event)
+        if not self._guards:
+            return True
+        return _guard_evaluator.evaluate(self._guards, event)
 
     def execute_actions(self, event: Event) -> None:
         """
@@ -95,6 +105,24 @@ class Transition:
         """The actions to execute when this transition occurs."""
         return self._actions
 
+    @property
+    def guard_cost(self) -> int:
+        """
+        Relative cost estimate of evaluating the guards, used to try cheaper transitions
+        first among those of equal priority. Defaults to the number of guards; subclasses
+        with expensive guards may return a higher value.
+        """
+        return len(self._guards)
+
+    @property
+    def pure_guards(self) -> bool:
+        """Whether the guards depend only on the event name."""
+        return self._pure_guards
+
+
+# Reads the priority snapshot directly, avoiding a method call per comparison
+_priority_of = operator.attrgetter("_sort_priority")
+
 
 class _TransitionPrioritySorter:
     """
@@ -111,6 +139,22 @@ class _TransitionPrioritySorter:
         """
         return sorted(transitions, key=lambda t: t.get_priority(), reverse=True)
 
+    def insert(self, transitions: List[Transition], transition: Transition) -> None:
+        """
+        Insert a transition into a list already ordered by descending priority,
+        keeping the list ordered. Among equal priorities, transitions with cheaper
+        guards come first so failing candidates are rejected sooner; ties keep
+        insertion order.
+
+        :param transitions: A list of Transition instances sorted by descending priority.
+        :param transition: The Transition instance to insert.
+        """
+        # Snapshot priority so ordering honours get_priority() overrides
+        transition._sort_priority = transition.get_priority()
+        keys = [(-_priority_of(t), t.guard_cost) for t in transitions]
+        index = bisect.bisect_right(keys, (-_priority_of(transition), transition.guard_cost))
+        transitions.insert(index, transition)
+
 
 class _GuardEvaluator:
     """
@@ -131,6 +175,10 @@ class _GuardEvaluator:
         return True
 
 
+# Stateless, so a single instance serves every transition on the dispatch path
+_guard_evaluator = _GuardEvaluator()
+
+
 class _ActionExecutor:
     """
     Internal helper to execute a list of actions when a transition fires, handling
@@ -99,19 +99,21 @@ class AsyncStateMachine(StateMachine):
             return
 
         # Resolve the correct starting state
-        self._current_state = self._resolve_state_for_start()
-
-        # Validate machine structure with potential async validator
-        errors = self._graph.validate()
-        if errors:
-            raise ValidationError("\n".join(errors))
-
-        if hasattr(self._validator, "validate_state_machine"):
-            validate_method = self._validator.validate_state_machine
-            if asyncio.iscoroutinefunction(validate_method):
-                await validate_method(self)
-            else:
-                validate_method(self)
+        self._set_current_state(self._resolve_state_for_start())
+
+        # Validate machine structure with potential async validator, unless unchanged since it last passed
+        if self._graph_revision != self._last_validated_rev:
+            errors = self._graph.validate()
+            if errors:
+                raise ValidationError("\n".join(errors))
+
+            if hasattr(self._validator, "validate_state_machine"):
+                validate_method = self._validator.validate_state_machine
+                if asyncio.iscoroutinefunction(validate_method):
+                    await validate_method(self)
+                else:
+                    validate_method(self)
+            self._last_validated_rev = self._graph_revision
 
         self._notify_enter(self._current_state)
         self._started = True
@@ -122,7 +124,7 @@ class AsyncStateMachine(StateMachine):
             return
         if self._current_state:
             await self._notify_exit_async(self._current_state)
-        self._current_state = None
+        self._set_current_state(None)
         self._started = False
 
     async def process_event(self, event: Event) -> bool:
@@ -130,12 +132,11 @@ class AsyncStateMachine(StateMachine):
         if not self._started or not self._current_state:
             return False
 
-        valid_transitions = self._graph.get_valid_transitions(self._current_state, event)
-        if not valid_transitions:
+        # Take highest priority transition
+        transition = self._graph.get_first_valid_transition(self._current_state, event)
+        if transition is None:
             return False
 
-        # Take highest priority transition
-        transition = max(valid_transitions, key=lambda t: t.get_priority())
         await self._execute_transition_async(transition, event)
         return True
 
@@ -144,7 +145,7 @@ class AsyncStateMachine(StateMachine):
         try:
             await self._notify_exit_async(self._current_state)
             transition.execute_actions(event)
-            self._current_state = transition.target
+            self._set_current_state(transition.target)
             await self._notify_enter_async(self._current_state)
         except Exception as e:
             # Handle error only once, at the top level
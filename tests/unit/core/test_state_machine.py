@@ -179,3 +179,263 @@ def test_hook_behavior():
     hook.on_exit.assert_called_once_with(state1)
     assert hook.on_enter.call_count == 2  # Once for initial, once for transition
     hook.on_enter.assert_has_calls([call(state1), call(state2)])
+
+
+def test_highest_priority_transition_wins():
+    """Test that the highest priority transition with passing guards is taken."""
+    state1 = State("state1")
+    low_target = State("low")
+    high_target = State("high")
+    machine = StateMachine(state1)
+    machine.add_state(low_target)
+    machine.add_state(high_target)
+
+    machine.add_transition(Transition(source=state1, target=low_target, priority=1))
+    machine.add_transition(Transition(source=state1, target=high_target, priority=5))
+    machine.add_transition(Transition(source=state1, target=low_target, guards=[lambda e: False], priority=10))
+
+    machine.start()
+    assert machine.process_event(Event("test"))
+    assert machine.current_state == high_target
+
+
+def test_async_enter_hook_skipped():
+    """Test that async on_enter hooks are not called by the synchronous machine."""
+    state1 = State("state1")
+    calls = []
+
+    class Hook:
+        async def on_enter(self, state):
+            calls.append(state)
+
+        def on_exit(self, state):
+            calls.append(state)
+
+    machine = StateMachine(state1, hooks=[Hook()])
+    machine.start()
+    assert calls == []
+    machine.stop()
+    assert calls == [state1]
+
+
+def test_detect_cycles():
+    """Test cycle detection in the state hierarchy."""
+    leaf = State("leaf")
+    inner = CompositeState("inner", initial_state=leaf)
+    outer = CompositeState("outer", initial_state=inner)
+    machine = StateMachine(outer)
+    assert machine.detect_cycles() == []
+
+    # Force a cycle back to the root
+    inner._children.add(outer)
+    assert machine.detect_cycles() == ["Cycle detected: outer -> inner"]
+
+
+def test_restart_skips_unchanged_validation(basic_machine):
+    """Test that restarting an unchanged machine does not revalidate it."""
+    machine, _, state2, _ = basic_machine
+    machine._validator = Mock()
+
+    machine.start()
+    machine.stop()
+    machine.start()
+    assert machine._validator.validate_state_machine.call_count == 1
+
+    # Structural changes force revalidation on the next start
+    machine.stop()
+    machine.add_transition(Transition(source=state2, target=state2))
+    machine.start()
+    assert machine._validator.validate_state_machine.call_count == 2
+
+
+def test_composite_machine_routes_to_active_submachine():
+    """Test that events reach the submachine of the current composite state."""
+    child1 = State("child1")
+    child2 = State("child2")
+    group = CompositeState("group", initial_state=child1)
+
+    submachine = StateMachine(child1)
+    submachine.add_state(child2, parent=group)
+    submachine.add_transition(Transition(source=child1, target=child2))
+
+    machine = CompositeStateMachine(group)
+    machine.add_submachine(group, submachine)
+    assert machine._active_submachine is submachine
+
+    machine.start()
+    submachine.start()
+    assert machine.process_event(Event("test"))
+    assert submachine.current_state == child2
+
+    machine.stop()
+    assert machine._active_submachine is None
+
+
+def test_add_hook(basic_machine):
+    """Test that hooks added after construction are notified."""
+    machine, state1, state2, _ = basic_machine
+    hook = Mock()
+    machine.add_hook(hook)
+
+    machine.start()
+    machine.process_event(Event("test"))
+
+    hook.on_enter.assert_has_calls([call(state1), call(state2)])
+    hook.on_exit.assert_called_once_with(state1)
+
+
+def test_pure_guard_dispatch_is_cached():
+    """Test that transition selection is memoized only for pure guards."""
+    state1 = State("state1")
+    state2 = State("state2")
+    pure_guard = Mock(return_value=True)
+    impure_guard = Mock(return_value=True)
+
+    machine = StateMachine(state1)
+    machine.add_state(state2)
+    machine.add_transition(Transition(source=state1, target=state2, guards=[pure_guard], pure_guards=True))
+    machine.add_transition(Transition(source=state2, target=state1, guards=[impure_guard]))
+    machine.start()
+
+    for _ in range(2):
+        assert machine.process_event(Event("go"))  # state1 -> state2
+        assert machine.process_event(Event("go"))  # state2 -> state1
+
+    assert pure_guard.call_count == 1
+    assert impure_guard.call_count == 2
+
+
+def test_get_priority_override_respected():
+    """Test that a get_priority() override orders transitions and is not compounded."""
+
+    class BoostedTransition(Transition):
+        def get_priority(self):
+            return self._priority + 10
+
+    state1 = State("state1")
+    plain_target = State("plain")
+    boosted_target = State("boosted")
+    machine = StateMachine(state1)
+    machine.add_state(plain_target)
+    machine.add_state(boosted_target)
+
+    plain = Transition(source=state1, target=plain_target, priority=5)
+    boosted = BoostedTransition(source=state1, target=boosted_target, priority=1)
+    machine.add_transition(plain)
+    machine.add_transition(boosted)
+
+    assert boosted.get_priority() == 11
+    assert machine._graph.get_valid_transitions(state1, Event("test")) == [boosted, plain]
+    assert machine._context._by_source[state1] == [boosted, plain]
+
+    machine.start()
+    assert machine.process_event(Event("test"))
+    assert machine.current_state == boosted_target
+
+
+def test_add_state_rejects_duplicate_name_in_scope():
+    """Test that add_state rejects a different state reusing a name in the same parent."""
+    idle = State("idle")
+    group = CompositeState("group", initial_state=idle)
+    other = CompositeState("other")
+    machine = StateMachine(group)
+    machine.add_state(idle, parent=group)
+    machine.add_state(idle, parent=group)  # Same object again is fine
+    machine.add_state(State("idle"), parent=other)  # Same name, different parent
+
+    with pytest.raises(ValueError):
+        machine.add_state(State("idle"), parent=group)
+
+    # Duplicate names at the top level are rejected too
+    machine.add_state(State("top"))
+    with pytest.raises(ValueError):
+        machine.add_state(State("top"))
+
+
+def test_add_submachine_allows_names_reused_in_nested_composites():
+    """Test that a submachine reusing a child name under different composites can be attached."""
+    idle_a = State("idle")
+    idle_b = State("idle")
+    composite_a = CompositeState("A", initial_state=idle_a)
+    composite_b = CompositeState("B", initial_state=idle_b)
+    group = CompositeState("group", initial_state=composite_a)
+
+    submachine = StateMachine(composite_a)
+    submachine.add_state(idle_a, parent=composite_a)
+    submachine.add_state(composite_b, parent=group)
+    submachine.add_state(idle_b, parent=composite_b)
+    submachine.add_transition(Transition(source=idle_a, target=composite_b))
+
+    machine = CompositeStateMachine(group)
+    machine.add_submachine(group, submachine)
+
+    assert {idle_a, idle_b} <= machine._graph.get_children(group)
+    assert machine._active_submachine is submachine
+
+
+def test_history_with_directly_assigned_parent():
+    """Test that history follows a parent assigned directly on the state."""
+    child1 = State("child1")
+    child2 = State("child2")
+    group = CompositeState("group")
+    child1.parent = group
+    child2.parent = group
+
+    machine = StateMachine(child1)
+    machine.add_state(child2)
+    machine.add_transition(Transition(source=child1, target=child2))
+    machine.start()
+    assert machine.process_event(Event("test"))
+
+    machine.stop()
+    assert machine.get_history_state(group) is child2
+    machine.start()
+    assert machine.current_state is child2
+
+
+def test_reassigned_composite_initial_state_used_for_dispatch():
+    """Test that reassigning a current composite's initial state changes the dispatch source."""
+    child1 = State("child1")
+    child2 = State("child2")
+    target = State("target")
+    group = CompositeState("group", initial_state=child1)
+    group.add_child_state(child2)
+
+    machine = StateMachine(group)
+    machine.add_state(child1, parent=group)
+    machine.add_state(child2, parent=group)
+    machine.add_state(target)
+    machine.add_transition(Transition(source=child1, target=target))
+    machine.start()
+
+    group.initial_state = child2
+    assert not machine.process_event(Event("go"))
+    assert machine.current_state is group
+
+
+def test_dispatch_cache_unused_without_pure_guards(basic_machine):
+    """Test that a machine that never opts into pure guards caches nothing."""
+    machine, state1, state2, _ = basic_machine
+    machine.start()
+    assert machine.process_event(Event("go"))  # state1 -> state2, which has no transitions
+
+    for i in range(10):
+        assert not machine.process_event(Event(f"event{i}"))
+    assert len(machine._dispatch_cache) == 0
+
+
+def test_dispatch_cache_is_bounded(monkeypatch):
+    """Test that the dispatch cache evicts least recently used entries beyond its size."""
+    import hsm.core.state_machine as state_machine_module
+
+    monkeypatch.setattr(state_machine_module, "_DISPATCH_CACHE_SIZE", 2)
+    state1 = State("state1")
+    state2 = State("state2")
+    machine = StateMachine(state1)
+    machine.add_state(state2)
+    machine.add_transition(Transition(source=state1, target=state2, guards=[lambda e: False], pure_guards=True))
+    machine.start()
+
+    for name in ["a", "b", "a", "c"]:
+        assert not machine.process_event(Event(name))
+    assert list(machine._dispatch_cache) == [(id(state1), "a"), (id(state1), "c")]
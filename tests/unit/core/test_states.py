@@ -65,3 +65,10 @@ def test_state_data_isolation():
 
     assert state1.data["test"] != state2.data["test"]
     assert not hasattr(parent, "data")
+
+
+def test_composite_flag():
+    """Test that only composite states are flagged as composite."""
+    assert State("Leaf")._is_composite is False
+    assert CompositeState("Composite")._is_composite is True
+
@@ -102,3 +102,93 @@ def test_multiple_transitions():
     assert len(transitions) == 2
     assert t1 in transitions
     assert t2 in transitions
+
+
+def test_transitions_ordered_by_priority():
+    """Test that transitions are returned highest priority first."""
+    graph = StateGraph()
+    state1 = State("state1")
+    state2 = State("state2")
+    state3 = State("state3")
+
+    graph.add_state(state1)
+    graph.add_state(state2)
+    graph.add_state(state3)
+
+    low = Transition(source=state1, target=state2, priority=1)
+    high = Transition(source=state1, target=state3, priority=5)
+    blocked = Transition(source=state1, target=state3, guards=[lambda e: False], priority=10)
+    graph.add_transition(low)
+    graph.add_transition(high)
+    graph.add_transition(blocked)
+
+    event = Event("test")
+    assert graph.get_valid_transitions(state1, event) == [high, low]
+    assert graph.get_first_valid_transition(state1, event) is high
+    assert graph.get_first_valid_transition(state2, event) is None
+
+
+def test_cheaper_guards_tried_first_within_priority():
+    """Test that equal priority transitions are ordered by guard cost."""
+    graph = StateGraph()
+    state1 = State("state1")
+    state2 = State("state2")
+
+    graph.add_state(state1)
+    graph.add_state(state2)
+
+    expensive = Transition(source=state1, target=state2, guards=[lambda e: True, lambda e: True])
+    cheap = Transition(source=state1, target=state2, guards=[lambda e: True])
+    urgent = Transition(source=state1, target=state2, guards=[lambda e: True] * 3, priority=1)
+    graph.add_transition(expensive)
+    graph.add_transition(cheap)
+    graph.add_transition(urgent)
+
+    assert graph.get_valid_transitions(state1, Event("test")) == [urgent, cheap, expensive]
+
+
+def test_get_composite_ancestors():
+    """Test that composite ancestors are cached and refreshed on re-parenting."""
+    graph = StateGraph()
+    outer = CompositeState("outer")
+    inner = CompositeState("inner")
+    plain = State("plain")
+    leaf = State("leaf")
+
+    graph.add_state(inner)
+    graph.add_state(plain, parent=inner)
+    graph.add_state(leaf, parent=plain)
+    assert graph.get_composite_ancestors(leaf) == (inner,)
+
+    # Attaching a new root must be reflected for existing descendants
+    graph.add_state(inner, parent=outer)
+    assert graph.get_composite_ancestors(leaf) == (inner, outer)
+
+
+def test_state_names_unique_per_scope():
+    """Test that a name maps to a single state object within a parent scope."""
+    graph = StateGraph()
+    parent1 = CompositeState("parent1")
+    parent2 = CompositeState("parent2")
+    idle = State("idle")
+
+    graph.intern_state(idle, parent1)
+    graph.intern_state(idle, parent1)  # Re-registering the same object is fine
+    graph.intern_state(State("idle"), parent2)  # Same name, different scope
+
+    with pytest.raises(ValueError):
+        graph.intern_state(State("idle"), parent1)
+
+    # Moving a state to another scope releases its old one
+    graph.intern_state(idle, None)
+    graph.intern_state(State("idle"), parent1)
+
+
+def test_add_state_does_not_check_names():
+    """Test that the graph itself accepts repeated names under one parent."""
+    graph = StateGraph()
+    parent = CompositeState("parent")
+
+    graph.add_state(State("idle"), parent=parent)
+    graph.add_state(State("idle"), parent=parent)
+    assert len(graph.get_children(parent)) == 2